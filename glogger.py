@@ -4,26 +4,29 @@ This module provides a logger setup to init global logger for the application
 import logging
 
 #logger setup
-def _setup_logger(name="app_logger", level=logging.DEBUG, out=True):
+def _setup_logger(name="app_logger", level=None, out=True):
     """
     Sets up a logger with the specified name and logging level
 
     Args:
         name (str): The name of the logger, default is 'app_logger'
-        level (int): The logging level, default is logging.DEBUG
+        level (int): The logging level, default is logging.DEBUG with output
+        and logging.WARNING without it, so that info calls return early
+        out (bool): Whether to attach a console handler, default is True
 
     Returns:
         logging.Logger: A configured logger instance
     """
+    if level is None:
+        level = logging.DEBUG if out else logging.WARNING
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    if out:
+    if out and not logger.handlers:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(level)
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         console_handler.setFormatter(formatter)
-        if not logger.handlers:
-            logger.addHandler(console_handler)
+        logger.addHandler(console_handler)
 
     return logger
 
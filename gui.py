@@ -5,27 +5,46 @@ The GUI includes functionalities for displaying
 and combining DNA images, as well as adjusting contrast.
 It uses the Tkinter library for the graphical interface
 """
+import logging
+import os
 import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from scrollableimage import ScrollableImage
 from glogger import logger
 from togglebutton import ToggleButton, ContrButtons
+from iconcache import IconRegistry
+
+#toolbar icons are decoded at import, before the Tk root is created
+IconRegistry.register("upload", "icons/upload_min.png", "icons/upload_min_toggle_white.png", 38, 38)
+IconRegistry.register("comb", "icons/comp_min.png", "icons/comp_min_toggle_white.png", 43, 43)
+IconRegistry.register("contr", "icons/contr_min.png", "icons/contr_min_toggle_white.png", 40, 40)
+IconRegistry.register("com_zoom", "icons/com_zoom_min.png", "icons/com_zoom_min_toggle_white.png", 50, 25)
+
 class GUI:
     """
     A class to create a graphical user interface for an app
     """
     #track button states
-    comb_clicked=contr_clicked=red_clicked=green_clicked=both_clicked=im_loaded=comb_zoom_clicked=False
+    comb_clicked=contr_clicked=im_loaded=comb_zoom_clicked=False
+    #channel targeted by contrast adjustment ('green', 'red' or 'both')
+    _active='both'
     #constant contrast guys
     STD_LOWER = 0
     STD_UPPER = 65535
     DEFAULT_CENTER = 32767
     DEFAULT_WIDTH = 65535
+    #Tcl validator for contrast entries; accepts "" or a decimal 0..65535
+    #ASCII digits only: 'string is digit' also accepts other Unicode digits, which scan rejects
+    VALRANGE_PROC = ('proc _valrange {v} {'
+                     ' if {$v eq ""} {return 1};'
+                     ' if {![regexp {^[0-9]{1,5}$} $v]} {return 0};'
+                     ' scan $v %d n;'
+                     ' return [expr {$n <= 65535}] }')
     #variable contrast guys
     last_contr=last_contr_comb=(32767, 65535)
-    lower_c1=lower_c2=lower_c=0
-    higher_c1=higher_c2=higher_c=65535
+    lower_c1=lower_c2=lower_c3=lower_c5=0 #c3/c5: Cy3/Cy5 channels of the combined image
+    higher_c1=higher_c2=higher_c3=higher_c5=65535
 
     def __init__(self, root):
         """
@@ -49,14 +68,19 @@ class GUI:
         self.gpath=self.rpath=self.gim=self.rim=self.cim=None
         self.button_upload=self.button_comb=self.button_contr=self.com_zoom=None
         self.contr_button_frame=self.button_green=self.button_red=self.button_both=None
+        self._radio_row=self._slider_row=None
         self.window_center=self.window_width=self.slider_center=self.slider_width=None
         self.window_center_frame=self.window_width_frame=None
+        self._contr_panel_shown=False
         #vars for running contrast adjustment in a separate thread
-        self.timer_id = None
-        self.computation_thread = None
+        self._pending = False
+        self._suppress_trace = False
+        self._cv = threading.Condition()
+        self._pending_params = None
+        self._worker = threading.Thread(target=self._contrast_loop, daemon=True)
+        self._worker.start()
         #init layout
         self.init_layout()
-        self.root.update()
         self.toggle_radio_button('both')
 
         self.root.bind("<MouseWheel>", self.check_zoom)
@@ -119,10 +143,11 @@ class GUI:
         im_target.zoom_to_level(event, im_level)
 
         dims=im_target.pyramid[im_target.c_level][1]
+        cnvs_w, cnvs_h=im_target.get_canvas_size()
         im_target.offset_x=x_offset
         im_target.offset_y=y_offset
-        max_x_offset = max(dims[0] - im_target.cnvs.winfo_width(), 0)
-        max_y_offset = max(dims[1] - im_target.cnvs.winfo_height(), 0)
+        max_x_offset = max(dims[0] - cnvs_w, 0)
+        max_y_offset = max(dims[1] - cnvs_h, 0)
         x_offset=max(0, min(x_offset, max_x_offset))
         y_offset= max(0, min(y_offset, max_y_offset))
         im_target.move_to(x_offset,y_offset)
@@ -138,7 +163,6 @@ class GUI:
         self.button_row(self.top_frame)
         #init palceholders for left and right frames
         self.init_lr_frames()
-        self.root.update()
 
         #for testing
         # self.load_n_disp("data/GSM364164_Poplar_July_20_05_13263264_Cy3_Dec_19_2005.tif",
@@ -163,15 +187,15 @@ class GUI:
         """
         Hides left and right frames
         """
-        if hasattr(self, 'left_frame') and self.left_frame.winfo_exists():
+        if self.left_frame is not None:
             self.left_frame.pack_forget()
             logger.info("Left frame hidden")
 
-        if hasattr(self, 'seperator') and self.seperator.winfo_exists():
+        if self.seperator is not None:
             self.seperator.pack_forget()
             logger.info("Seperator hidden")
 
-        if hasattr(self, 'right_frame') and self.right_frame.winfo_exists():
+        if self.right_frame is not None:
             self.right_frame.pack_forget()
             logger.info("Right frame hidden")
 
@@ -179,28 +203,33 @@ class GUI:
         """
         Displays left and right frames
         """
-        if hasattr(self, 'left_frame') and self.left_frame.winfo_exists():
+        if self.left_frame is not None:
             self.left_frame.pack(side="left", fill="both", expand=True)
             logger.info("Left frame shown")
 
-        if hasattr(self, 'seperator') and self.seperator.winfo_exists():
+        if self.seperator is not None:
             self.seperator.pack(side="left", fill="y")
             logger.info("Seperator shown")
 
-        if hasattr(self, 'right_frame') and self.right_frame.winfo_exists():
+        if self.right_frame is not None:
             self.right_frame.pack(side="right", fill="both", expand=True)
             logger.info("Right frame shown")
 
     def del_lr_frames(self):
         """
-        Deletes left and right frames
+        Deletes left and right frames and the seperator between them
         """
-        if hasattr(self, 'left_frame') and self.left_frame.winfo_exists():
+        if self.left_frame is not None:
             self.left_frame.destroy()
             self.left_frame = None
             logger.info("Left frame deleted")
 
-        if hasattr(self, 'right_frame') and self.right_frame.winfo_exists():
+        if self.seperator is not None:
+            self.seperator.destroy()
+            self.seperator = None
+            logger.info("Seperator deleted")
+
+        if self.right_frame is not None:
             self.right_frame.destroy()
             self.right_frame = None
             logger.info("Right frame deleted")
@@ -217,7 +246,8 @@ class GUI:
         """
         #delete existing frames
         for widget in frame.winfo_children():
-            logger.info("Deleting widget: %s", widget)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Deleting widget: %s", widget)
             widget.destroy()
         #create ScrollableImage object ad pack into frame
         try:
@@ -245,7 +275,8 @@ class GUI:
             gpath (str): Path to the green channel image
             rpath (str): Path to the red channel image
         """
-        #frame width part
+        #frame width part; the only place that needs settled geometry
+        self.root.update_idletasks()
         frame_width = self.root.winfo_width() // 2
         self.left_frame.config(width=frame_width)
         self.right_frame.config(width=frame_width)
@@ -269,9 +300,6 @@ class GUI:
             self.last_contr=(int(self.window_center.get()), int(self.window_width.get()))
             self.slider_center.set(self.last_contr_comb[0])
             self.slider_width.set(self.last_contr_comb[1])
-            self.button_green.pack_forget()
-            self.button_red.pack_forget()
-            self.button_both.pack_forget()
             self.left_coords_label.config(text="Combined image:")
             self.right_coords_label.pack_forget()
 
@@ -280,6 +308,7 @@ class GUI:
 
             if self.new_frame is None:
                 self.new_frame=tk.Frame(self.root, bg="gray")
+            if self.cim is None:
                 self.new_frame.pack(side="bottom", fill="both", expand=True)
                 try:
                     image_window = ScrollableImage(coords_label=self.left_coords_label, master=self.new_frame, gim=self.gim,
@@ -293,7 +322,6 @@ class GUI:
                 logger.info("Combined image created")
             else:
                 self.new_frame.pack(side="bottom", fill="both", expand=True)
-                self.root.update()
                 logger.info("Used existing frame")
 
             logger.info("Combined image displayed")
@@ -304,14 +332,6 @@ class GUI:
             self.last_contr_comb=(int(self.window_center.get()), int(self.window_width.get()))
             self.slider_center.set(self.last_contr[0])
             self.slider_width.set(self.last_contr[1])
-            self.window_center_frame.pack_forget()
-            self.window_width_frame.pack_forget()
-            self.button_green.pack(side="left", padx=5, pady=5)
-            self.button_red.pack(side="left", padx=5, pady=5)
-            self.button_both.pack(side="left", padx=5, pady=5)
-            self.window_center_frame.pack(side="left", padx=5, pady=5)
-            self.window_width_frame.pack(side="left", padx=5, pady=5)
-            self.root.update()
             self.left_coords_label.config(text="Green image:")
             self.right_coords_label.pack(side="right", padx=5, pady=5)
             self.right_coords_label.config(text="Red image:")
@@ -353,42 +373,26 @@ class GUI:
         separator = tk.Frame(button_frame, bg="#d7d7d7", height=1)
         separator.pack(side="bottom", fill="both", pady=(3, 1))
 
-        self.button_upload=ToggleButton(button_frame,
-                                        ic_path="icons/upload_min.png",
-                                        ic_path_clicked="icons/upload_min_toggle_white.png",
-                                        h_size=38,
-                                        v_size=38,
-                                        compound="center",
-                                        bg="#181818",
-                                        border=0,
-                                        command=self.choose_file_and_disp)
-        self.button_comb=ToggleButton(button_frame,
-                                      ic_path="icons/comp_min.png",
-                                      ic_path_clicked="icons/comp_min_toggle_white.png",
-                                      h_size=43,
-                                      v_size=43,
-                                      compound="center",
-                                      bg="#181818",
-                                      border=0,
-                                      command=self.toggle_button_comb)
-        self.button_contr=ToggleButton(button_frame,
-                                       ic_path="icons/contr_min.png",
-                                       ic_path_clicked="icons/contr_min_toggle_white.png",
-                                       h_size=40,
-                                       v_size=40,
-                                       compound="center",
-                                       bg="#181818",
-                                       border=0,
-                                       command=self.toggle_button_contr)
-        self.com_zoom=ToggleButton(button_frame,
-                                       ic_path="icons/com_zoom_min.png",
-                                       ic_path_clicked="icons/com_zoom_min_toggle_white.png",
-                                       h_size=50,
-                                       v_size=25,
-                                       compound="center",
-                                       bg="#181818",
-                                       border=0,
-                                       command=self.toggle_button_comb_zoom)
+        self.button_upload=ToggleButton.from_registry(button_frame, "upload",
+                                                      compound="center",
+                                                      bg="#181818",
+                                                      border=0,
+                                                      command=self.choose_file_and_disp)
+        self.button_comb=ToggleButton.from_registry(button_frame, "comb",
+                                                    compound="center",
+                                                    bg="#181818",
+                                                    border=0,
+                                                    command=self.toggle_button_comb)
+        self.button_contr=ToggleButton.from_registry(button_frame, "contr",
+                                                     compound="center",
+                                                     bg="#181818",
+                                                     border=0,
+                                                     command=self.toggle_button_contr)
+        self.com_zoom=ToggleButton.from_registry(button_frame, "com_zoom",
+                                                 compound="center",
+                                                 bg="#181818",
+                                                 border=0,
+                                                 command=self.toggle_button_comb_zoom)
 
     def add_contr_buttons(self, parent_frame=None):
         """
@@ -410,38 +414,53 @@ class GUI:
         separator_contr_left.pack(side="left", fill="both", pady=(3, 1))
         separator_contr_right.pack(side="right", fill="both", pady=(3, 1))
 
-        self.button_green=ContrButtons(self.contr_button_frame,
-                                       text="Green",
-                                       compound="center",
-                                       bg="gray",
-                                       fg="white",
-                                       border=0,
-                                       command=self.toggle_button_green).get_button()
-        self.button_green.pack(side="left", padx=5, pady=5)
-
-        self.button_red=ContrButtons(self.contr_button_frame,
-                                     text="Red",
-                                     compound="center",
-                                     bg="white",
-                                     fg="white",
-                                     border=0,
-                                     command=self.toggle_button_red).get_button()
-        self.button_red.pack(side="left", padx=5, pady=5, anchor="center")
-
-        self.button_both=ContrButtons(self.contr_button_frame,
-                                      text="Both",
-                                      compound="center",
-                                      bg="white",
-                                      fg="white",
-                                      border=0,
-                                      command=self.toggle_button_both).get_button()
-        self.button_both.pack(side="left", padx=5, pady=5, anchor="center")
+        #radio buttons pick the channel the sliders adjust, also in combined mode
+        self._radio_row = tk.Frame(self.contr_button_frame, bg="#181818")
+        self._radio_row.pack(side="left")
+
+        green=ContrButtons(self._radio_row,
+                           text="Green",
+                           compound="center",
+                           bg="gray",
+                           fg="white",
+                           border=0,
+                           command=self.toggle_button_green)
+        self.button_green=green.get_button()
+
+        red=ContrButtons(self._radio_row,
+                         text="Red",
+                         compound="center",
+                         bg="white",
+                         fg="white",
+                         border=0,
+                         command=self.toggle_button_red)
+        self.button_red=red.get_button()
+
+        both=ContrButtons(self._radio_row,
+                          text="Both",
+                          compound="center",
+                          bg="white",
+                          fg="white",
+                          border=0,
+                          command=self.toggle_button_both)
+        self.button_both=both.get_button()
+
+        #radio colors are named styles of ContrButtons
+        self._radio_widgets = {'green': green,
+                               'red': red,
+                               'both': both}
 
     def add_sliders(self):
         """
         Adds sliders for window center and width adjustments
         """
-        self.window_center_frame = tk.Frame(self.contr_button_frame,
+        #entry validation runs per keystroke, so keep it inside Tcl
+        self.root.tk.eval(self.VALRANGE_PROC)
+
+        self._slider_row = tk.Frame(self.contr_button_frame, bg="#181818")
+        self._slider_row.pack(side="left")
+
+        self.window_center_frame = tk.Frame(self._slider_row,
                                             relief="flat",
                                             highlightbackground="#575655",
                                             highlightthickness=0.5)
@@ -453,12 +472,11 @@ class GUI:
         self.window_center.trace_add("write", self.update_slider_center)
         window_center_label = tk.Label(label_entry_center_frame, text="Window center")
         window_center_label.pack(side="left", anchor="w")
-        center_vcmd=label_entry_center_frame.register(self.scale_range)
         entry_center = tk.Entry(label_entry_center_frame,
                                 textvariable=self.window_center,
                                 width=10,
                                 validate="key",
-                                validatecommand=(center_vcmd, "%P"))
+                                validatecommand=("_valrange", "%P"))
         entry_center.pack(side="right", anchor="e")
         self.slider_center = tk.Scale(self.window_center_frame,
                                       from_=0,
@@ -470,7 +488,7 @@ class GUI:
         self.slider_center.set(self.DEFAULT_CENTER)
         self.slider_center.pack(side="bottom", anchor="w")
 
-        self.window_width_frame = tk.Frame(self.contr_button_frame,
+        self.window_width_frame = tk.Frame(self._slider_row,
                                            relief="flat",
                                            highlightbackground="#575655",
                                            highlightthickness=0.5)
@@ -482,12 +500,11 @@ class GUI:
         self.window_width.trace_add("write", self.update_slider_width)
         window_width_label = tk.Label(label_entry_width_frame, text="Window width")
         window_width_label.pack(side="left", anchor="w")
-        width_vcmd = label_entry_width_frame.register(self.scale_range)
         entry_width = tk.Entry(label_entry_width_frame,
                                textvariable=self.window_width,
                                width=10,
                                validate="key",
-                               validatecommand=(width_vcmd, "%P"))
+                               validatecommand=("_valrange", "%P"))
         entry_width.pack(side="right", anchor="e")
         self.slider_width = tk.Scale(self.window_width_frame,
                                      from_=0,
@@ -499,23 +516,6 @@ class GUI:
         self.slider_width.set(self.DEFAULT_WIDTH)
         self.slider_width.pack(side="bottom", anchor="w")
 
-    def scale_range(self, value):
-        """
-        Validates whether a given value is within the acceptable range for sliders
-
-        Args:
-            value (str): The value to validate
-
-        Returns:
-            bool: True if the value is valid, False otherwise
-        """
-        if value == "":
-            return True
-        if value.isdigit():
-            value_int = int(value)
-            return 0 <= value_int <= 65535
-        return False
-
     def toggle_button_comb(self):
         """
         Toggles the state of the combine button and updates the interface accordingly
@@ -543,12 +543,13 @@ class GUI:
         """
         Shows or hides the contrast adjustment panel
         """
-        if self.contr_button_frame.winfo_ismapped():
-            self.contr_button_frame.pack_forget()
-            logger.info("Contrast panel hidden")
-        else:
+        self._contr_panel_shown = not self._contr_panel_shown
+        if self._contr_panel_shown:
             self.contr_button_frame.pack(side="top", pady=5)
             logger.info("Contrast panel shown")
+        else:
+            self.contr_button_frame.pack_forget()
+            logger.info("Contrast panel hidden")
 
     def update_entry_center(self, value):
         """
@@ -557,7 +558,11 @@ class GUI:
         Args:
             value (str): The new slider value
         """
-        self.window_center.set(int(float(value)))
+        self._suppress_trace = True
+        try:
+            self.window_center.set(int(float(value)))
+        finally:
+            self._suppress_trace = False
         self.timed_conf()
 
     def update_entry_width(self, value):
@@ -567,23 +572,40 @@ class GUI:
         Args:
             value (str): The new slider value
         """
-        self.window_width.set(int(float(value)))
+        self._suppress_trace = True
+        try:
+            self.window_width.set(int(float(value)))
+        finally:
+            self._suppress_trace = False
         self.timed_conf()
 
     def timed_conf(self):
         """
-        Delays the confirmation of contrast adjustments 
-        to allow multiple changes without redundant processing
+        Delays the confirmation of contrast adjustments until Tk is idle;
+        slider moves within one idle cycle are coalesced into a single recompute
         """
-        if self.timer_id is not None:
-            self.root.after_cancel(self.timer_id)
+        if not self._pending:
+            self._pending = True
+            self.root.after_idle(self._flush_contrast)
 
-        self.timer_id = self.root.after(100, self.confirm_windowing)
+    def _flush_contrast(self):
+        """
+        Reads the latest window center and width once and confirms windowing
+        """
+        self._pending = False
+        try:
+            params = (int(self.window_center.get()), int(self.window_width.get()))
+        except ValueError:
+            logger.error("Invalid value entered in text field")
+            return
+        self.confirm_windowing(params)
 
     def update_slider_center(self, *args):
         """
         Updates the slider for window center when the text entry is modified
         """
+        if self._suppress_trace:
+            return
         try:
             value = int(self.window_center.get())
             if self.slider_center["from"] <= value <= self.slider_center["to"]:
@@ -597,6 +619,8 @@ class GUI:
         """
         Updates the slider for window width when the text entry is modified
         """
+        if self._suppress_trace:
+            return
         try:
             value = int(self.window_width.get())
             if self.slider_width["from"] <= value <= self.slider_width["to"]:
@@ -606,51 +630,50 @@ class GUI:
         except ValueError:
             logger.error("Invalid value entered in text field")
 
-    def choose_file(self):
+    def choose_files(self):
         """
-        Opens a file dialog to allow the user to select a file
+        Opens a single file dialog to allow the user to select both channel files;
+        files with Cy3/Cy5 in their names are assigned to the green/red channel,
+        otherwise the selection order is used
 
         Returns:
-            str: The selected file path
+            tuple: The selected green and red channel file paths
 
         Raises:
-            Exception: If no file is selected or the file is not a .tif file
+            Exception: If not exactly two files are selected
         """
-        file_path = filedialog.askopenfilename(
-            title="Select a File",
-            filetypes=(("tif files", "*.tif"), ("All files", "*.*"))
+        paths = filedialog.askopenfilenames(
+            title="Select green then red channel files",
+            filetypes=(("tif files", "*.tif"),)
         )
-        if file_path and file_path.endswith(".tif"):
-            logger.info("Selected File: %s", file_path)
-            return file_path
-        elif file_path and not file_path.endswith(".tif"):
-            logger.info("Selected file is not a tif file")
-            raise Exception("Selected file is not a tif file")
-        else:
+        if not paths:
             logger.info("no file selected :<")
             raise Exception("No file selected")
+        if len(paths) != 2:
+            logger.info("%s files selected instead of 2", len(paths))
+            raise Exception("Select exactly two files (green and red channel)")
+
+        gpath, rpath = paths
+        gname, rname = os.path.basename(gpath).lower(), os.path.basename(rpath).lower()
+        if "cy5" in gname and "cy3" in rname:
+            gpath, rpath = rpath, gpath
+        logger.info("Selected files: %s, %s", gpath, rpath)
+        return gpath, rpath
 
     def choose_file_and_disp(self):
         """
-        Opens file dialogs to select two files (green and red channels) and displays them
+        Opens a file dialog to select two files (green and red channels) and displays them
         """
         try:
-            self.gpath=self.choose_file()
-            self.rpath=self.choose_file()
+            self.gpath, self.rpath=self.choose_files()
 
             self.clear_all()
-            if hasattr(self, 'new_frame') and self.new_frame is not None and self.new_frame.winfo_exists():
-                self.new_frame.destroy()
-                self.new_frame = None
-            if hasattr(self, 'left_frame') and self.left_frame.winfo_exists():
-                self.left_frame.destroy()
-                self.left_frame = None
-            if hasattr(self, 'right_frame') and self.right_frame.winfo_exists():
-                self.right_frame.destroy()
-                self.right_frame = None
+            #reuse existing frames; only the combined image is dropped, comb_ims rebuilds it
+            if self.new_frame is not None:
+                for widget in self.new_frame.winfo_children():
+                    widget.destroy()
+                self.new_frame.pack_forget()
 
-            self.init_lr_frames()
-            self.root.update()
             self.load_n_disp(self.gpath, self.rpath)
         except Exception as e:
             logger.error("Error displaying image: %s", e)
@@ -668,9 +691,9 @@ class GUI:
             self.toggle_button_comb_zoom()
         self.toggle_radio_button('both')
 
-        self.seperator = self.gim = self.rim = self.cim= None
-        self.lower_c1 = self.lower_c2 = self.lower_c=0
-        self.higher_c1 = self.higher_c2 = self.higher_c = 65535
+        self.gim = self.rim = self.cim= None
+        self.lower_c1 = self.lower_c2 = self.lower_c3 = self.lower_c5 = 0
+        self.higher_c1 = self.higher_c2 = self.higher_c3 = self.higher_c5 = 65535
         self.window_center.set(self.DEFAULT_CENTER)
         self.window_width.set(self.DEFAULT_WIDTH)
         self.slider_center.set(self.DEFAULT_CENTER)
@@ -698,47 +721,68 @@ class GUI:
                )
 
 
-    def confirm_windowing(self):
+    def confirm_windowing(self, params):
         """
-        Confirms and applies contrast adjustments based on the current windowing parameters
+        Hands the windowing parameters to the contrast worker;
+        parameters not yet picked up by the worker are replaced, not queued
+
+        Args:
+            params (tuple): Window center and width
         """
-        if self.computation_thread and self.computation_thread.is_alive():
-            return
+        with self._cv:
+            self._pending_params = params
+            self._cv.notify()
 
-        self.computation_thread = threading.Thread(target=self._run_contrast_adjustment)
-        self.computation_thread.start()
+    def _contrast_loop(self):
+        """
+        Contrast worker loop; always processes the latest pending parameters
+        """
+        while True:
+            with self._cv:
+                while self._pending_params is None:
+                    self._cv.wait()
+                params, self._pending_params = self._pending_params, None
+            try:
+                self._run_contrast_adjustment(*params)
+            except Exception as e:
+                logger.error("Error adjusting contrast: %s", e)
 
-    def _run_contrast_adjustment(self):
+    def _run_contrast_adjustment(self, center, width):
         """
         Runs the contrast adjustment logic for the images
+
+        Args:
+            center (int): The window center
+            width (int): The window width
         """
         if not self.comb_clicked:
 
-            if self.green_clicked:
-                self.lower_c1, self.higher_c1 = self.windowing_parameters(self.window_center.get(),
-                                                                          self.window_width.get())
-            elif self.red_clicked:
-                self.lower_c2, self.higher_c2 = self.windowing_parameters(self.window_center.get(),
-                                                                          self.window_width.get())
-            elif self.both_clicked:
-                self.lower_c1, self.higher_c1 = self.windowing_parameters(self.window_center.get(),
-                                                                          self.window_width.get())
+            if self._active == 'green':
+                self.lower_c1, self.higher_c1 = self.windowing_parameters(center, width)
+            elif self._active == 'red':
+                self.lower_c2, self.higher_c2 = self.windowing_parameters(center, width)
+            elif self._active == 'both':
+                self.lower_c1, self.higher_c1 = self.windowing_parameters(center, width)
                 self.lower_c2, self.higher_c2 = self.lower_c1, self.higher_c1
 
             self.root.after(0, self.disp_alter_contr_ims)
 
         if self.comb_clicked:
-            self.lower_c, self.higher_c = self.windowing_parameters(self.window_center.get(),
-                                                                    self.window_width.get())
-            self.root.after(0, lambda: self.cim.alter_contr((self.lower_c, self.higher_c)))
+            #the combined image is windowed per channel, the radio buttons pick the channel
+            if self._active in ('green', 'both'):
+                self.lower_c3, self.higher_c3 = self.windowing_parameters(center, width)
+            if self._active in ('red', 'both'):
+                self.lower_c5, self.higher_c5 = self.windowing_parameters(center, width)
+            contr=(self.lower_c3, self.higher_c3, self.lower_c5, self.higher_c5)
+            self.root.after(0, lambda: self.cim.alter_contr(contr))
 
     def disp_alter_contr_ims(self):
         """
         Alteres contrast of images and displays them
         """
-        if self.green_clicked or self.both_clicked:
+        if self._active in ('green', 'both'):
             self.gim.alter_contr((self.lower_c1, self.higher_c1))
-        if self.red_clicked or self.both_clicked:
+        if self._active in ('red', 'both'):
             self.rim.alter_contr((self.lower_c2, self.higher_c2))
 
     def toggle_button_green(self):
@@ -766,16 +810,6 @@ class GUI:
         Args:
             button_name (str): The name of the button to toggle ('green', 'red', or 'both')
         """
-        buttons = {
-            'green': ('!button', 'lightgreen', 'black'),
-            'red': ('!button2', 'lightcoral', 'black'),
-            'both': ('!button3', 'gold', 'black')
-        }
-        for name, (widget, _, _) in buttons.items():
-            self.contr_button_frame.children[widget].configure(bg="#181818", fg="white")
-            setattr(self, f"{name}_clicked", False)
-
-        if button_name in buttons:
-            widget, color, tcolor = buttons[button_name]
-            self.contr_button_frame.children[widget].configure(bg=color, fg=tcolor)
-            setattr(self, f"{button_name}_clicked", True)
+        for name, button in self._radio_widgets.items():
+            button.set_style(name if name == button_name else "inactive")
+        self._active = button_name if button_name in self._radio_widgets else None
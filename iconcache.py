@@ -0,0 +1,177 @@
+"""
+This module provides a cache of decoded toolbar icons
+
+Icons are decoded and resized once per (path, size) and the resulting
+PhotoImage is shared by every button that uses it (also after it is evicted
+from the decode cache, for as long as any button holds it); icons prebuilt at their
+display size (see tools/prebuild_icons.py) are decoded instead of the large sources
+
+Toolbar icons are registered by name with IconRegistry, which decodes
+them with PIL on background threads right away, e.g. at import time before
+the Tk root exists; only PhotoImages are then created on the Tk thread.
+Icons that are not registered are decoded on first use
+"""
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageTk
+from glogger import logger
+
+class IconRegistry:
+    """
+    Named pairs of toolbar icons (default and clicked state) decoded ahead of time;
+    load_icon builds PhotoImages from the decoded images instead of reading the files
+
+    Decoding runs on a small thread pool (PIL releases the GIL while decoding),
+    so registering does not block; an icon still being decoded is waited for
+    """
+    _icons = {}
+    _decoded = {} #futures of decoded images
+    _pool = ThreadPoolExecutor(max_workers=4)
+
+    @classmethod
+    def register(cls, name, path, path_clicked, h_size, v_size):
+        """
+        Registers a pair of icons under a name and starts decoding them
+
+        Args:
+            name (str): The name of the icon pair
+            path (str): The path to the default state icon
+            path_clicked (str): The path to the clicked state icon
+            h_size (int): The width of the icons
+            v_size (int): The height of the icons
+        """
+        cls._icons[name] = (path, path_clicked, h_size, v_size)
+        for icon_path in (path, path_clicked):
+            key = (os.path.normpath(icon_path), int(h_size), int(v_size))
+            if key not in cls._decoded:
+                cls._decoded[key] = cls._pool.submit(_decode, _prebuilt_path(*key), key[1], key[2])
+
+    @classmethod
+    def get(cls, name):
+        """
+        Retrieves a registered icon pair
+
+        Args:
+            name (str): The name of the icon pair
+
+        Returns:
+            tuple: Paths of the default and clicked state icons, width and height
+        """
+        return cls._icons[name]
+
+    @classmethod
+    def pop_decoded(cls, key):
+        """
+        Takes a decoded icon out of the registry; it is needed only until its PhotoImage exists
+
+        Args:
+            key (tuple): Normalized path, width and height of the icon
+
+        Returns:
+            PIL.Image.Image: The decoded icon, or None if it was not decoded ahead of time
+        """
+        future = cls._decoded.pop(key, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error("Error loading image: %s", e)
+            return None
+
+#icons held by widgets; keeps them shared regardless of the decode cache
+_in_use = weakref.WeakValueDictionary()
+
+def load_icon(path, h_size, v_size):
+    """
+    Loads an icon from disk and resizes it; repeated calls are served from cache,
+    also when the same file is referred to by a differently spelled path
+
+    Args:
+        path (str): The path to the icon file
+        h_size (int): The width of the icon
+        v_size (int): The height of the icon
+
+    Returns:
+        ImageTk.PhotoImage: The decoded icon ready for a Tk widget
+    """
+    key = (os.path.normpath(path), int(h_size), int(v_size))
+    icon = _in_use.get(key)
+    if icon is None:
+        icon = _in_use[key] = _load_icon(*key)
+    return icon
+
+@lru_cache(maxsize=64)
+def _load_icon(path, h_size, v_size):
+    """
+    Decodes and resizes an icon, taking it from IconRegistry if it was decoded ahead of time,
+    otherwise from '<name>@<width>x<height>.png' next to it if it exists;
+    cached by normalized path and integer size
+
+    Args:
+        path (str): The normalized path to the icon file
+        h_size (int): The width of the icon
+        v_size (int): The height of the icon
+
+    Returns:
+        ImageTk.PhotoImage: The decoded icon ready for a Tk widget
+    """
+    decoded = IconRegistry.pop_decoded((path, h_size, v_size))
+    if decoded is None: #not registered, or already turned into a PhotoImage and evicted
+        decoded = _decode(_prebuilt_path(path, h_size, v_size), h_size, v_size)
+    return ImageTk.PhotoImage(decoded)
+
+def _prebuilt_path(path, h_size, v_size):
+    """
+    Picks '<name>@<width>x<height>.png' next to an icon if it exists
+
+    Args:
+        path (str): The path to the icon file
+        h_size (int): The width of the icon
+        v_size (int): The height of the icon
+
+    Returns:
+        str: The path of the prebuilt icon, or path if there is none
+    """
+    prebuilt = f"{os.path.splitext(path)[0]}@{h_size}x{v_size}.png"
+    return prebuilt if os.path.exists(prebuilt) else path
+
+def _decode(path, h_size, v_size):
+    """
+    Decodes an icon with PIL and resizes it; does not need Tk
+
+    Args:
+        path (str): The path to the icon file
+        h_size (int): The width of the icon
+        v_size (int): The height of the icon
+
+    Returns:
+        PIL.Image.Image: The decoded icon
+    """
+    #the file is closed as soon as the icon is decoded
+    with Image.open(path) as src:
+        if src.size != (h_size, v_size):
+            src.draft("RGBA", (h_size, v_size)) #lets decoders that support it (JPEG) decode at lower scale
+        src.load()
+        if src.size != (h_size, v_size):
+            #bilinear is indistinguishable from the default bicubic at toolbar sizes and cheaper
+            im = src.resize((h_size, v_size), Image.BILINEAR)
+        else:
+            im = src.copy()
+    return _strip_opaque_alpha(im)
+
+def _strip_opaque_alpha(im):
+    """
+    Drops the alpha channel of an icon without any transparent pixel
+
+    Args:
+        im (PIL.Image.Image): The icon
+
+    Returns:
+        PIL.Image.Image: The icon in RGB mode if it is fully opaque, otherwise unchanged
+    """
+    if im.mode == "RGBA" and im.getchannel("A").getextrema() == (255, 255):
+        return im.convert("RGB")
+    return im
@@ -2,11 +2,24 @@
 This module provides the MDNA class for image processing, including loading, 
 manipulating color channels, contrast adjustment, and combining images
 
-Our solution uses OpenCV for loading and processing of tiff files
+Our solution uses OpenCV for loading and processing of tiff files;
+integer images are windowed with a lookup table, other images with
+the numba kernel from windowing_numba when numba is installed; the kernel
+is imported only when such an image is windowed, so numba does not slow down startup
+
+Optional dependencies:
+- tifffile; if installed, uncompressed grayscale tiff files are memory-mapped
+instead of read into memory with OpenCV; the mapping is kept as the loaded
+image (also for channel images), so pages are read only when the pyramid needs them
 """
+from functools import lru_cache
 import cv2
 import numpy as np
 from glogger import logger
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
 
 class MDNA:
     """
@@ -16,61 +29,71 @@ class MDNA:
 
     Attributes:
         cy (numpy.ndarray): The loaded image in memory
+        channel (int): The color channel of the image; 1 for green, 2 for red, None for grayscale
     """
     def __init__(self, cy=None, channel=None):
         """
-        Initializes the MDNA object by loading an image and optionally applying a color channel
+        Initializes the MDNA object by loading an image and optionally assigning a color channel
 
         Args:
             cy (str): Path to the image file to load.
-            channel (int, optional): The color channel to apply;
+            channel (int, optional): The color channel of the image;
             1 for green, 2 for red. Defaults to None
         """
+        if channel not in (None, 1, 2):
+            raise Exception("Invalid channel")
+        self.channel=channel
         self.cy=self._im_load(cy, channel)
 
     def _im_load(self, path, channel=None):
         """
-        Loads an 16-bit image from the specified path and optionally applies a color channel
+        Loads an 16-bit image from the specified path; channel images stay
+        single-plane, they are colored when windowed for display
 
         Args:
             path (str): The file path to the image
-            channel (int, optional): The color channel to apply;
+            channel (int, optional): The color channel of the image;
             1 for green, 2 for red. Defaults to None
 
         Returns:
-            numpy.ndarray: The loaded image. Returns None if the image could not be loaded
+            numpy.ndarray: The loaded image, the read-only memmap itself if the file is mapped.
+            Returns None if the image could not be loaded
         """
         try:
-            im=cv2.imread(path, -1)
+            im=self._tiff_memmap(path)
+            if im is None:
+                im=cv2.imread(path, -1)
             if channel is not None: #if channel isn't given then image is black and white
-                im=self._get_c_image(im, channel)
                 logger.info("Image with channel %s loaded", channel)
             return im
         except Exception as e:
             logger.error("Error loading image: %s", e)
             return None
 
-    def _get_c_image(self, im, channel):
+    @staticmethod
+    def _tiff_memmap(path):
         """
-        Applies a specified color channel to a grayscale image
+        Maps an uncompressed grayscale tiff file into memory read-only;
+        pages are read from disk only when accessed
 
         Args:
-            im (numpy.ndarray): The input grayscale image
-            channel (int): The color channel to apply; 
-                            1 for green, 2 for red
+            path (str): The file path to the image
 
         Returns:
-            numpy.ndarray: The image with the specified color channel applied
+            numpy.memmap: The mapped image. Returns None if tifffile is not installed
+            or the file cannot be mapped (e.g. it is compressed or big-endian)
         """
-        if channel is None:
-            return im
-        zeros = np.zeros_like(im, dtype=im.dtype)
-        if channel==1:
-            im = cv2.merge([zeros, im, zeros])
-        elif channel==2:
-            im = cv2.merge([im, zeros, zeros])
-        else:
-            raise Exception("Invalid channel")
+        if tifffile is None or not str(path).lower().endswith(('.tif', '.tiff')):
+            return None
+        try:
+            im=tifffile.memmap(path, mode='r')
+        except Exception as e:
+            logger.info("Tiff file not mapped, reading it instead: %s", e)
+            return None
+        if im.ndim != 2: #color tiffs are RGB, OpenCV reads them as BGR
+            return None
+        if not im.dtype.isnative: #big-endian (MM) tiff; OpenCV would read the bytes swapped
+            return None
         return im
 
     def _std_contrast(self):
@@ -81,12 +104,9 @@ class MDNA:
         Returns:
             numpy.ndarray: The contrast-adjusted image
         """
-        lower = np.min(self.cy)
-        upper = np.max(self.cy)
-        windowed_image = np.clip(self.cy, lower, upper)
-        image = ((windowed_image - lower) / (upper - lower) * 255).astype(np.uint8)
-        logger.info("Windowing with lower=%lo upper=%u", lower, upper)
-        return image
+        #single pass over the data
+        lower, upper, _, _ = cv2.minMaxLoc(self.cy.reshape(-1, 1))
+        return self.windowing(self.cy, int(lower), int(upper))
 
     def get_im(self):
         """
@@ -109,23 +129,47 @@ class MDNA:
     @staticmethod
     def get_combined_image(cy3, cy5):
         """
-        Combines two images by merging their color channels
+        Combines two single-plane images by stacking them as channels,
+        so that each can be windowed separately
 
         Args:
             cy3 (numpy.ndarray): The first image to combine (Cy3 channel)
             cy5 (numpy.ndarray): The second image to combine (Cy5 channel)
 
         Returns:
-            numpy.ndarray: The combined image with channels merged
+            numpy.ndarray: The combined image with (Cy5, Cy3), i.e. (red, green), channels
         """
-        zeros = np.zeros_like(cy3[:,:,1], dtype=cy3.dtype)
-        combined_image = cv2.merge([cy5[:,:,0], cy3[:,:,1], zeros])
-        return combined_image
+        return np.stack((cy5, cy3), axis=-1)
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def build_window_lut(lower, upper):
+        """
+        Builds a lookup table mapping every 16-bit intensity to its windowed 8-bit value;
+        tables are cached, so moving between recently used windows does not rebuild them
+
+        Args:
+            lower (int): The lower intensity threshold
+            upper (int): The upper intensity threshold
+
+        Returns:
+            numpy.ndarray: Read-only uint8 table of length 65536
+        """
+        levels = np.arange(65536, dtype=np.float32)
+        if upper <= lower:
+            #degenerate window is a threshold
+            lut = ((levels > lower) * 255).astype(np.uint8)
+        else:
+            lut = np.clip((levels - lower) * (255.0 / (upper - lower)), 0, 255).astype(np.uint8)
+        lut.flags.writeable = False
+        return lut
 
     @staticmethod
     def windowing(cy, lower, upper):
         """
-        Adjusts contrast of an image
+        Adjusts contrast of an image; 8- and 16-bit inputs are transformed
+        with a single lookup per pixel into a 65536-entry table, other
+        inputs are scaled and clipped directly
 
         Args:
             cy (numpy.ndarray): The input image
@@ -135,8 +179,19 @@ class MDNA:
         Returns:
             numpy.ndarray: The contrast-adjusted image after windowing
         """
-        windowed_image = np.clip(cy, lower, upper)
-        image = ((windowed_image - lower) / (upper - lower) * 255).astype(np.uint8)
+        if cy.dtype in (np.uint8, np.uint16):
+            lut = MDNA.build_window_lut(lower, upper)
+            image = np.take(lut, cy)
+        elif upper <= lower:
+            image = ((cy > lower) * 255).astype(np.uint8)
+        else:
+            from windowing_numba import window_to_u8 #imports numba on first use
+            if window_to_u8 is not None:
+                image = np.empty(cy.shape, dtype=np.uint8)
+                #channels are flattened into rows, the kernel works on 2D images
+                window_to_u8(np.ascontiguousarray(cy).reshape(cy.shape[0], -1), float(lower),
+                             255.0 / (upper - lower), image.reshape(cy.shape[0], -1))
+            else:
+                image = np.clip((cy - lower) * (255.0 / (upper - lower)), 0, 255).astype(np.uint8)
         logger.info("Windowing with lower=%s, upper=%s", lower, upper)
         return image
-            
\ No newline at end of file
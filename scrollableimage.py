@@ -6,20 +6,19 @@ and contrast adjustments using a Tkinter-based GUI
 
 Invariants:
 - Zooming levels are cashed. They are initialized during the zoom operation
-but can be precomputed up to a certain level
+but can be precomputed up to a certain level; levels missing while zooming are
+resized on a worker thread and shown scaled from the nearest cached level meanwhile
 - To display image in the canvas image it is cropped to the visible portion
 of the screen (loading whole image into canvas would be too slow)
 - The image is resized to fit the canvas while maintaining its aspect ratio;
-default interpolation method is cv2.INTER_LINEAR
-- Since contrast adjustment are applied with respect to the 16-bit image,
-new contrast images rewrite those in the pyramid (there are just too
-many possibilities for the level of the contrast window that makes
-cashing images for each contrast level impractical)
-- It may seem that it is cheaper to store interpolated versions of the 16-bit image
-and apply contrast changes to them, but it is not the case. Since windowing method
-in MDNA class is considerably less efficient than cv2.resize method for huge 
-matrices, it is cheaper to apply contrast change to original 16-bit image once
-and then interpolate for each zoom level at each contrast change
+default interpolation method is cv2.INTER_AREA for shrinking and
+cv2.INTER_LINEAR for enlarging
+- The pyramid stores interpolated versions of the 16-bit image, so it does not
+depend on the contrast window. Contrast is applied with a lookup table
+(see MDNA.windowing) to TILE_SIZE tiles of the visible portion only, with
+a table per channel for combined images; windowed
+tiles are cached until the contrast changes, so contrast change only rebuilds
+the 65536-entry table and re-windows the visible tiles
 
 Possible improvements:
 - Using interpolation only to visible portion of the image
@@ -31,6 +30,11 @@ lagging would still occur since loading image into Tkinter canvas is not efficie
 lags for fullscreen or almost fullscrean images. Usage of alternative
 library for GUI management may turn out to be more efficient
 - CUDA acceleration for image processing would be a great improvement
+
+Optional dependencies:
+- pyvips; if installed, it is used for shrinking very large images
+(see ScrollableImage.VIPS_MIN_PIXELS), e.g. the initial fit-to-canvas
+resize of a full scan. Otherwise cv2.resize is used everywhere
 ---------------------------------------------------------------------------
 
 Above points were not implemented in this project, since 
@@ -39,28 +43,87 @@ mentioned functionalities. They were noticed in the hindsight.
 """
 
 import tkinter as tk
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from PIL import Image, ImageTk
 import cv2
+import numpy as np
 from mdna import MDNA
 from glogger import logger
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+
+#numpy dtypes that pyvips can wrap without conversion
+_VIPS_FORMATS = {np.dtype(np.uint8): 'uchar', np.dtype(np.uint16): 'ushort'}
+
+def _pyvips_resize(im, dim):
+    """
+    Shrinks an image with pyvips, which processes it in tiles instead of as a whole
+
+    Args:
+        im (numpy.ndarray): The image to resize
+        dim (tuple): Target (width, height)
+
+    Returns:
+        numpy.ndarray: The resized image, or None if the dtype is not supported
+    """
+    fmt = _VIPS_FORMATS.get(im.dtype)
+    if fmt is None:
+        return None
+    h, w = im.shape[:2]
+    bands = im.shape[2] if im.ndim == 3 else 1
+    vim = pyvips.Image.new_from_memory(np.ascontiguousarray(im).data, w, h, bands, fmt)
+    vim = vim.resize(dim[0] / w, vscale=dim[1] / h)
+    out = np.ndarray(buffer=vim.write_to_memory(), dtype=im.dtype,
+                     shape=(vim.height, vim.width, vim.bands))
+    if im.ndim == 2:
+        out = out[:, :, 0]
+    if (out.shape[1], out.shape[0]) != dim: #rounding in vips may differ by a pixel
+        out = cv2.resize(out, dim, interpolation=cv2.INTER_AREA)
+    return out
+
+def _pil_view(im):
+    """
+    Wraps a C-contiguous 8-bit image as a PIL image without copying it
+
+    Args:
+        im (numpy.ndarray): Grayscale (h, w) or RGB (h, w, 3) uint8 image
+
+    Returns:
+        PIL.Image.Image: Image sharing the memory of im
+    """
+    mode = 'L' if im.ndim == 2 else 'RGB'
+    return Image.frombuffer(mode, (im.shape[1], im.shape[0]), im, 'raw', mode, 0, 1)
 
 class ScrollableImage(tk.Frame):
     """
     A class for displaying and interacting with heavy tif images in a and zoomable Tkinter frame
 
     Attributes:
-        INTERPOLATION (int): Interpolation method used for resizing (default is cv2.INTER_LINEAR)
+        INTERPOLATION (int): Interpolation method used for enlarging (default is cv2.INTER_LINEAR)
+        DOWN_INTERPOLATION (int): Interpolation method used for shrinking (default is cv2.INTER_AREA)
         ZOOM_FACTOR (float): The zoom factor for scaling the image
-        PRE_COMP (bool): Whether to precompute zoom levels
+        PRE_COMP (bool): Whether to precompute zoom levels in a background thread
         PRE_COMP_LEVEL (int): The level up to which zooming is precomputed
         MAX_INZOOM_LEVEL (int): Maximum zoom-in level allowed
+        MAX_CHAIN_DEPTH (int): Maximum number of successive resizes a level may be derived through
+        VIPS_MIN_PIXELS (int): Source size from which shrinking goes through pyvips, if installed
+        TILE_SIZE (int): Side of the square tiles windowed images are cached in
+        TILE_CACHE_SIZE (int): Maximum number of cached windowed tiles
     """
     INTERPOLATION=cv2.INTER_LINEAR
+    DOWN_INTERPOLATION=cv2.INTER_AREA
     ZOOM_FACTOR=1.15
-    PRE_COMP=False #change to False for testing, faster loading
+    PRE_COMP=True #runs in background, does not delay loading
     PRE_COMP_LEVEL=5
     MAX_INZOOM_LEVEL=13
+    MAX_CHAIN_DEPTH=3
+    VIPS_MIN_PIXELS=50_000_000
+    TILE_SIZE=512
+    TILE_CACHE_SIZE=128
 
     def __init__(self, coords_label, master=None, **kw):
         """
@@ -77,6 +140,8 @@ class ScrollableImage(tk.Frame):
         self.gim=kw.pop('gim', None)
         self.rim=kw.pop('rim', None)
         self.contr=(kw.pop('lower', None), kw.pop('upper', None))
+        if self.gim is not None and self.rim is not None:
+            self.contr=self.contr*2 #(lower3, upper3, lower5, upper5)
         self.coords_label = coords_label
 
         #dragging
@@ -84,13 +149,25 @@ class ScrollableImage(tk.Frame):
         self.last_y = None
         self.offset_x = 0
         self.offset_y = 0
-        self.last_scroll_time = 0
-        self.delay = 0.0001
+        self._render_pending = False
         self.pyramid = {}
+        self._pyr_depth = {} #resizes each level went through; missing means resized from original
+        self._pyr_lock = threading.Lock()
+        self._anchors = [] #Gaussian pyramid of the original, halved at each step
+        self._bg_stop = threading.Event()
+        self._exec = ThreadPoolExecutor(max_workers=1) #resizes of levels missing while zooming
         self.c_level, self.p_level = None, None
         self.or_im=None
         self.old_img_w, self.old_img_h=None, None
-        self.orig_windowed_im=None
+        self._luts=[] #one windowing table per stored channel
+        #offscreen buffer for the windowed crop and windowed tiles it is stitched from
+        self._offscreen=None
+        self._tiles=OrderedDict()
+        #coordinates label
+        self._coords_map=None
+        self._coords_pending=False
+        self._coords_text=None
+        self._motion_event=None
 
         #init MDNA object
         if self.gim is None and self.rim is None:
@@ -105,6 +182,8 @@ class ScrollableImage(tk.Frame):
         self.cnvs = tk.Canvas(self, highlightthickness=0, bg="#181818", **kw)
         self.image_id = self.cnvs.create_image(0, 0, anchor='center', image=self.tk_im)
         self.cnvs.grid(row=0, column=0, sticky='nsew')
+        #canvas size, kept up to date on <Configure> instead of querying Tk per event
+        self._cw, self._ch = self.cnvs.winfo_reqwidth(), self.cnvs.winfo_reqheight()
         self.rowconfigure(0, weight=1)
         self.columnconfigure(0, weight=1)
 
@@ -120,7 +199,10 @@ class ScrollableImage(tk.Frame):
         Updates the position of the image in the canvas to center it;
         Also to adjust max outscroll durign window resize
         """
-        self.cnvs.coords(self.image_id, self.cnvs.winfo_width() / 2, self.tk_im.height()/2-1)
+        if event is not None:
+            self._cw, self._ch = event.width, event.height
+        self._coords_map=None
+        self.cnvs.coords(self.image_id, self._cw / 2, self.tk_im.height()/2-1)
         self.move_to(self.offset_x, self.offset_y)
         self._upd_upper_bound()
 
@@ -128,20 +210,20 @@ class ScrollableImage(tk.Frame):
         """
         Updates the upper bounds for zooming
         """
-        if self.tk_im.height()<self.cnvs.winfo_height():
+        if self.tk_im.height()<self._ch:
             level=self.p_level
 
-            while (level in self.pyramid and self.pyramid[level][1][1]<self.cnvs.winfo_height()):
+            while (level in self.pyramid and self.pyramid[level][1][1]<self._ch):
                 level+=1
-            im, width, height = self.resize_keeping_ratio(self.orig_windowed_im,
-                                                          height=self.cnvs.winfo_height())
+            im, width, height = self.resize_keeping_ratio(self.or_im,
+                                                          height=self._ch)
 
-            self.pyramid["outscroll"] = (im, (width, height), self.contr)
+            self._set_outscroll(im, width, height)
             self.p_level=level
             self.c_level="outscroll"
 
-            logger.info("final pyramid level %s with dim %sx%s and window %s-%s",
-                        self.c_level, width, height, self.contr[0], self.contr[1])
+            logger.info("final pyramid level %s with dim %sx%s",
+                        self.c_level, width, height)
 
             self._zoom_image()
 
@@ -156,16 +238,14 @@ class ScrollableImage(tk.Frame):
             ImageTk.PhotoImage: The processed image ready for display
         """
         self.mdna = MDNA(self.image_path, self.channel)
-        if self.mdna is None:
+        self.or_im=self.mdna.get_im()
+        if self.or_im is None:
             logger.error("Error loading image")
             raise Exception("Image could not be loaded")
 
-        self.or_im=self.mdna.get_im()
-        im=MDNA.windowing(self.or_im, self.contr[0], self.contr[1])
-        self.orig_windowed_im=im
-
-        _, im, self.c_level=self._init_pyramid(im, width)
-        pil_image = Image.fromarray(im)
+        self._rebuild_lut()
+        _, im, self.c_level=self._init_pyramid(self.or_im, width)
+        pil_image = _pil_view(self._window(im))
         logger.info("new MDNA object created")
         return ImageTk.PhotoImage(pil_image)
 
@@ -182,11 +262,11 @@ class ScrollableImage(tk.Frame):
             ImageTk.PhotoImage: The processed combined image ready for dispaly
         """
         self.mdna = MDNA.get_combined_image(g.get_im(), r.get_im())
-        self.orig_windowed_im=MDNA.windowing(self.mdna, self.contr[0], self.contr[1])
         self.or_im=self.mdna
 
-        _, im, self.c_level=self._init_pyramid(self.orig_windowed_im, width)
-        pil_image = Image.fromarray(im)
+        self._rebuild_lut()
+        _, im, self.c_level=self._init_pyramid(self.or_im, width)
+        pil_image = _pil_view(self._window(im))
         logger.info("new MDNA object created")
         return ImageTk.PhotoImage(pil_image)
 
@@ -226,15 +306,32 @@ class ScrollableImage(tk.Frame):
         self.offset_x -= dx
         self.offset_y -= dy
 
-        max_x_offset = max(dims[0] - self.cnvs.winfo_width(), 0)
-        max_y_offset = max(dims[1] - self.cnvs.winfo_height(), 0)
+        max_x_offset = max(dims[0] - self._cw, 0)
+        max_y_offset = max(dims[1] - self._ch, 0)
         self.offset_x = max(0, min(self.offset_x, max_x_offset))
         self.offset_y = max(0, min(self.offset_y, max_y_offset))
 
-        self.move_to(self.offset_x, self.offset_y)
+        self._schedule_render()
 
         self.rec_pos(event)
 
+    def _schedule_render(self):
+        """
+        Schedules a redraw of the current view once Tk is idle;
+        offsets and zoom level are updated per event, but all events
+        that arrive before the next idle cycle share one redraw
+        """
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render_tick)
+
+    def _render_tick(self):
+        """
+        Redraws the view at the latest offsets
+        """
+        self._render_pending = False
+        self.move_to(self.offset_x, self.offset_y)
+
     def move_to(self, offset_x, offset_y):
         """
         Moves the view of the image to the specified offsets, 
@@ -246,8 +343,8 @@ class ScrollableImage(tk.Frame):
         """
         dims=self.pyramid[self.c_level][1]
 
-        x2 = offset_x + self.cnvs.winfo_width()
-        y2 = offset_y + self.cnvs.winfo_height()
+        x2 = offset_x + self._cw
+        y2 = offset_y + self._ch
 
         x2 = min(x2, dims[0])
         y2 = min(y2, dims[1])
@@ -256,7 +353,7 @@ class ScrollableImage(tk.Frame):
 
     def _crop_n_show(self, offset_x, offset_y, x2, y2):
         """
-        Crops and displays the visible portion of the image;
+        Crops, windows and displays the visible portion of the image;
         notice, that method works with respect to the current level of pyramid (zoom)
 
         Args:
@@ -265,18 +362,92 @@ class ScrollableImage(tk.Frame):
             x2 (int): Horizontal endpoint of the crop
             y2 (int): Vertical endpoint of the crop
         """
-        resized_im, dims,_= self.pyramid[self.c_level]
-        cropped_image = resized_im[int(offset_y):int(y2), int(offset_x):int(x2)]
+        resized_im, dims= self.pyramid[self.c_level]
+        cropped_image = self._render_crop(resized_im, int(offset_x), int(offset_y), int(x2), int(y2))
+        assert cropped_image.flags['C_CONTIGUOUS'], "crop must be C-contiguous to be wrapped by PIL"
 
-        visible_pil_image = Image.fromarray(cropped_image)
-        self.tk_im = ImageTk.PhotoImage(visible_pil_image)
-        self.cnvs.itemconfig(self.image_id, image=self.tk_im)
+        visible_pil_image = _pil_view(cropped_image)
+        #PhotoImage is reused while the crop size stays the same (dragging, zooming in);
+        #it is reallocated only when the visible region changes size
+        if (self.tk_im.width(), self.tk_im.height())==visible_pil_image.size:
+            self.tk_im.paste(visible_pil_image)
+        else:
+            self.tk_im = ImageTk.PhotoImage(visible_pil_image)
+            self.cnvs.itemconfig(self.image_id, image=self.tk_im)
         self.cnvs.config(scrollregion=(0, 0, dims[0], dims[1]))
-        self.cnvs.config(scrollregion=self.cnvs.bbox("all"))
 
         logger.info("moveto offset=(%s,%s), region=(%s:%s,%s:%s)",
                     offset_x, offset_y, offset_x, x2, offset_y, y2)
 
+    def _render_crop(self, resized_im, x1, y1, x2, y2):
+        """
+        Stitches the requested crop into the offscreen buffer from windowed tiles;
+        only tiles not cached for the current contrast are windowed
+
+        Args:
+            resized_im (numpy.ndarray): The 16-bit image of the current pyramid level
+            x1 (int): Horizontal offset of the crop
+            y1 (int): Vertical offset of the crop
+            x2 (int): Horizontal endpoint of the crop
+            y2 (int): Vertical endpoint of the crop
+
+        Returns:
+            numpy.ndarray: The windowed 8-bit crop
+        """
+        colored=resized_im.ndim==3 or self.channel is not None
+        shape=(max(y2-y1, 0), max(x2-x1, 0))+((3,) if colored else ())
+        out=self._offscreen
+        if out is None or out.shape!=shape:
+            out=self._offscreen=np.empty(shape, dtype=np.uint8)
+        if x2<=x1 or y2<=y1:
+            return out
+
+        t=self.TILE_SIZE
+        for ty in range(y1//t, (y2-1)//t+1):
+            for tx in range(x1//t, (x2-1)//t+1):
+                tile=self._get_tile(resized_im, tx, ty)
+                ix1, iy1 = max(x1, tx*t), max(y1, ty*t)
+                ix2, iy2 = min(x2, (tx+1)*t), min(y2, (ty+1)*t)
+                out[iy1-y1:iy2-y1, ix1-x1:ix2-x1]=tile[iy1-ty*t:iy2-ty*t, ix1-tx*t:ix2-tx*t]
+        return out
+
+    def _get_tile(self, resized_im, tx, ty):
+        """
+        Retrieves a windowed tile of a pyramid level, windowing it on first use;
+        the cache is least recently used and holds up to TILE_CACHE_SIZE tiles
+
+        Args:
+            resized_im (numpy.ndarray): The 16-bit image of the pyramid level
+            tx (int): Tile column
+            ty (int): Tile row
+
+        Returns:
+            numpy.ndarray: The windowed 8-bit tile
+        """
+        key=(id(resized_im), tx, ty)
+        entry=self._tiles.get(key)
+        if entry is not None and entry[0] is resized_im:
+            self._tiles.move_to_end(key)
+            return entry[1]
+
+        t=self.TILE_SIZE
+        tile=self._window(resized_im[ty*t:(ty+1)*t, tx*t:(tx+1)*t])
+        self._tiles[key]=(resized_im, tile)
+        if len(self._tiles)>self.TILE_CACHE_SIZE:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def _drop_tiles(self, resized_im):
+        """
+        Drops the cached tiles of a replaced pyramid level, so that the cache
+        does not keep its 16-bit image alive
+
+        Args:
+            resized_im (numpy.ndarray): The replaced image of the level
+        """
+        for key in [key for key, entry in self._tiles.items() if entry[0] is resized_im]:
+            del self._tiles[key]
+
     def _init_pyramid(self, im, width=None, height=None):
         """
         Initializes a pyramid of image zoom levels at different resolutions
@@ -292,34 +463,203 @@ class ScrollableImage(tk.Frame):
         level=0
         im, w, h = self.resize_keeping_ratio(im, width, height)
 
-        self.pyramid[level]=(im, (w, h), (self.contr[0], self.contr[1]))
+        with self._pyr_lock:
+            self.pyramid[level]=(im, (w, h))
         logger.info("pyramid initialized")
 
         if self.PRE_COMP:
-            for i in range(level+1, self.MAX_INZOOM_LEVEL+1):
-                w=int(w*self.ZOOM_FACTOR)
-                h=int(h*self.ZOOM_FACTOR)
-
-                if i>self.PRE_COMP_LEVEL:
-                    self.add_to_pyramid(i, self.orig_windowed_im, w, h)
+            threading.Thread(target=self._precompute_levels, args=(level, w, h), daemon=True).start()
 
         return self.pyramid, im, level
 
+    def _precompute_levels(self, level, w, h):
+        """
+        Precomputes anchor levels and zoom levels up to PRE_COMP_LEVEL; runs in
+        a background thread (OpenCV releases the GIL), levels already built by zooming are skipped
+
+        Args:
+            level (int): The base level
+            w (int): Width of the base level
+            h (int): Height of the base level
+        """
+        self._build_anchors(w)
+        for i in range(level+1, self.PRE_COMP_LEVEL+1):
+            w=int(w*self.ZOOM_FACTOR)
+            h=int(h*self.ZOOM_FACTOR)
+            if self._bg_stop.is_set():
+                return
+            if i not in self.pyramid:
+                self.add_to_pyramid(i, self.or_im, w, h)
+        logger.info("pyramid precomputed up to level %s", self.PRE_COMP_LEVEL)
+
+    def _build_anchors(self, base_w):
+        """
+        Builds factor-2 anchor levels from the original with cv2.pyrDown, down to the
+        base level width; with ZOOM_FACTOR 1.15 roughly every fifth zoom level doubles,
+        so each zoom level is resized from an anchor less than twice its size
+
+        Args:
+            base_w (int): Width of the base level
+        """
+        anchor = self.or_im
+        while anchor.shape[1]//2>=base_w:
+            if self._bg_stop.is_set():
+                return
+            anchor = cv2.pyrDown(anchor)
+            with self._pyr_lock:
+                self._anchors.append(anchor)
+            logger.info("anchor level with dim %sx%s", anchor.shape[1], anchor.shape[0])
+
+    def destroy(self):
+        """
+        Stops pyramid precomputation and pending resizes and destroys the widget
+        """
+        self._bg_stop.set()
+        self._exec.shutdown(wait=False) #queued resizes are dropped by _level_ready
+        super().destroy()
+
     def add_to_pyramid(self, level, im, width, height):
         """
-        Adds a new level to the image pyramid
+        Adds a new level to the image pyramid (see _pick_source)
 
         Args:
             level (int): The pyramid level to add
-            im (numpy.ndarray): The image to resize
+            im (numpy.ndarray): The original image to resize, used if no level fits
             width (int): Width for the new level
             height (int): Height for the new level
         """
-        im, width, height = self.resize_keeping_ratio(im, width, height)
-        self.pyramid[level] = (im, (width, height), self.contr)
+        src, depth = self._pick_source(im, width, height)
+        im, width, height = self.resize_keeping_ratio(src, width, height)
+        with self._pyr_lock:
+            self.pyramid[level] = (im, (width, height))
+            self._pyr_depth[level] = depth+1
 
-        logger.info("new pyramid level %s with dim %sx%s and contrast window %s-%s",
-                    level, width, height, self.contr[0], self.contr[1])
+        logger.info("new pyramid level %s with dim %sx%s", level, width, height)
+
+    def add_to_pyramid_async(self, level, im, width, height):
+        """
+        Adds a new level to the image pyramid without blocking the Tk thread; until the
+        resize on the worker is done, the level holds the nearest cached level scaled
+        with nearest neighbour interpolation (same dimensions, so offsets stay valid)
+
+        Args:
+            level (int): The pyramid level to add
+            im (numpy.ndarray): The original image to resize, used if no level fits
+            width (int): Width for the new level
+            height (int): Height for the new level
+        """
+        with self._pyr_lock:
+            near_im = min((level_im for level_im, _ in self.pyramid.values()),
+                          key=lambda level_im: abs(level_im.shape[1]-width))
+        placeholder, width, height = self.resize_keeping_ratio(near_im, width, height,
+                                                               inter=cv2.INTER_NEAREST)
+        with self._pyr_lock:
+            self.pyramid[level] = (placeholder, (width, height))
+            self._pyr_depth[level] = self.MAX_CHAIN_DEPTH #never used as a source
+
+        src, depth = self._pick_source(im, width, height)
+        future = self._exec.submit(self._resize_level, src, (width, height))
+        future.add_done_callback(
+            lambda f: self._level_ready(level, placeholder, depth+1, f))
+
+    def _pick_source(self, im, width, height):
+        """
+        Picks the smallest existing level or anchor that is still at least as large
+        as the requested size, unless that level is already MAX_CHAIN_DEPTH resizes
+        away from the original (interpolation errors accumulate);
+        anchors are proper Gaussian reductions and count as the original
+
+        Args:
+            im (numpy.ndarray): The original image, used if no level fits
+            width (int): Width of the new level
+            height (int): Height of the new level
+
+        Returns:
+            tuple: The source image and the number of resizes it went through
+        """
+        src, depth = im, 0
+        with self._pyr_lock:
+            levels = [(level_im, dims, self._pyr_depth.get(key, 1))
+                      for key, (level_im, dims) in self.pyramid.items()]
+            levels += [(anchor, (anchor.shape[1], anchor.shape[0]), 0) for anchor in self._anchors]
+        for level_im, (level_w, level_h), level_depth in levels:
+            if (level_w>=width and level_h>=height and level_depth<self.MAX_CHAIN_DEPTH
+                    and level_im.shape[0]*level_im.shape[1] < src.shape[0]*src.shape[1]):
+                src, depth = level_im, level_depth
+        return src, depth
+
+    def _resize_level(self, src, dim):
+        """
+        Resizes a source to exact level dimensions; runs on the worker
+
+        Args:
+            src (numpy.ndarray): The source image
+            dim (tuple): Dimensions (width, height) of the level
+
+        Returns:
+            numpy.ndarray: The resized image
+        """
+        im, width, height = self.resize_keeping_ratio(src, dim[0])
+        if (width, height)!=dim: #ratio of the source may round differently by a pixel
+            im = np.ascontiguousarray(cv2.resize(im, dim, interpolation=self.DOWN_INTERPOLATION))
+        return im
+
+    def _level_ready(self, level, placeholder, depth, future):
+        """
+        Hands a finished resize over to the Tk thread; runs on the worker
+
+        Args:
+            level (int): The pyramid level
+            placeholder (numpy.ndarray): The image the level held while resizing
+            depth (int): Number of resizes the level went through
+            future (concurrent.futures.Future): The finished resize
+        """
+        if self._bg_stop.is_set() or future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error("Error resizing pyramid level %s: %s", level, future.exception())
+            return
+        try:
+            self.after(0, self._install_level, level, placeholder, future.result(), depth)
+        except (RuntimeError, tk.TclError): #widget destroyed meanwhile
+            pass
+
+    def _install_level(self, level, placeholder, im, depth):
+        """
+        Replaces a placeholder level with its resized image and redraws if it is shown;
+        levels that were built otherwise in the meantime are kept
+
+        Args:
+            level (int): The pyramid level
+            placeholder (numpy.ndarray): The image the level held while resizing
+            im (numpy.ndarray): The resized image
+            depth (int): Number of resizes the level went through
+        """
+        self._drop_tiles(placeholder) #also if the level was built otherwise meanwhile
+        with self._pyr_lock:
+            if level not in self.pyramid or self.pyramid[level][0] is not placeholder:
+                return
+            self.pyramid[level] = (im, self.pyramid[level][1])
+            self._pyr_depth[level] = depth
+
+        logger.info("new pyramid level %s with dim %sx%s", level, im.shape[1], im.shape[0])
+        if level==self.c_level:
+            self._schedule_render()
+
+    def _set_outscroll(self, im, width, height):
+        """
+        Replaces the outscroll level, which fits the canvas height
+
+        Args:
+            im (numpy.ndarray): The resized image
+            width (int): Width of the level
+            height (int): Height of the level
+        """
+        with self._pyr_lock:
+            old=self.pyramid.get("outscroll")
+            self.pyramid["outscroll"] = (im, (width, height))
+        if old is not None:
+            self._drop_tiles(old[0])
 
     def mouse_scroll(self, event):
         """
@@ -328,10 +668,6 @@ class ScrollableImage(tk.Frame):
         Args:
             event (tk.Event): The mouse scroll event
         """
-        if time.time() - self.last_scroll_time < self.delay:
-            logger.info("scrolling skipped")
-            return
-
         dims=self.pyramid[self.c_level][1]
         self.old_img_w, self.old_img_h=dims
 
@@ -345,8 +681,8 @@ class ScrollableImage(tk.Frame):
             else:
                 return
 
-            if self.c_level not in self.pyramid or self.pyramid[self.c_level][2]!=self.contr:
-                self.add_to_pyramid(self.c_level, self.orig_windowed_im,
+            if self.c_level not in self.pyramid:
+                self.add_to_pyramid_async(self.c_level, self.or_im,
                                 self.old_img_w*self.ZOOM_FACTOR, self.old_img_h*self.ZOOM_FACTOR)
 
         #outscroll
@@ -354,28 +690,30 @@ class ScrollableImage(tk.Frame):
             w=int(self.old_img_w/self.ZOOM_FACTOR)
             h=int(self.old_img_h/self.ZOOM_FACTOR)
 
-            if h<=self.cnvs.winfo_height():
-                im, width, height = self.resize_keeping_ratio(self.orig_windowed_im,
-                                                              height=self.cnvs.winfo_height())
-                self.pyramid["outscroll"] = (im, (width, height), self.contr)
-                self.c_level="outscroll"
+            if h<=self._ch:
+                if ("outscroll" not in self.pyramid
+                        or self.pyramid["outscroll"][1][1]!=self._ch):
+                    im, width, height = self.resize_keeping_ratio(self.or_im,
+                                                                  height=self._ch)
+                    self._set_outscroll(im, width, height)
 
-                logger.info("final pyramid level %s with dim %sx%s and contrast window %s-%s",
-                            self.c_level, width, height, self.contr[0], self.contr[1])
+                    logger.info("final pyramid level %s with dim %sx%s",
+                                "outscroll", width, height)
+                self.c_level="outscroll"
 
             elif self.c_level!="outscroll":
                 self.p_level=self.c_level
                 self.c_level-=1
-                if self.c_level not in self.pyramid or self.pyramid[self.c_level][2]!=self.contr:
-                    self.add_to_pyramid(self.c_level, self.orig_windowed_im, w, h)
+                if self.c_level not in self.pyramid:
+                    self.add_to_pyramid_async(self.c_level, self.or_im, w, h)
 
             else:
                 level=self.p_level
                 while (level in self.pyramid and self.pyramid[level][1][1]>self.pyramid["outscroll"][1][1]):
                     level-=1
 
-                if level not in self.pyramid or self.pyramid[level][2]!=self.contr:
-                    self.add_to_pyramid(level, self.orig_windowed_im,
+                if level not in self.pyramid:
+                    self.add_to_pyramid_async(level, self.or_im,
                                         self.pyramid[level+1][1][0]/self.ZOOM_FACTOR,
                                         self.pyramid[level+1][1][1]/self.ZOOM_FACTOR)
                 self.c_level=level
@@ -387,10 +725,7 @@ class ScrollableImage(tk.Frame):
         mx=self.offset_x+event.x
         my=self.offset_y+event.y
 
-        try:
-            self._zoom_image(mx, my, event.x, event.y)
-        finally:
-            self.last_scroll_time=time.time()
+        self._zoom_image(mx, my, event.x, event.y)
 
     def _zoom_image(self, mouse_x_old=0, mouse_y_old=0, canvas_mouse_x=0, canvas_mouse_y=0):
         """
@@ -418,14 +753,12 @@ class ScrollableImage(tk.Frame):
         self.offset_x=new_mouse_x_in_image-canvas_mouse_x
         self.offset_y=new_mouse_y_in_image-canvas_mouse_y
 
-        max_x_offset=max(dims[0]-self.cnvs.winfo_width(), 0)
-        max_y_offset=max(dims[1]-self.cnvs.winfo_height(), 0)
+        max_x_offset=max(dims[0]-self._cw, 0)
+        max_y_offset=max(dims[1]-self._ch, 0)
         self.offset_x=max(0, min(self.offset_x, max_x_offset))
         self.offset_y=max(0, min(self.offset_y, max_y_offset))
-        crop_x2=min(dims[0], self.offset_x+self.cnvs.winfo_width())
-        crop_y2=min(dims[1], self.offset_y+self.cnvs.winfo_height())
 
-        self._crop_n_show(self.offset_x, self.offset_y, crop_x2, crop_y2)
+        self._schedule_render()
 
     def get_c_level(self):
         """
@@ -436,6 +769,15 @@ class ScrollableImage(tk.Frame):
         """
         return self.c_level
 
+    def get_canvas_size(self):
+        """
+        Retrieves the canvas size recorded on the last resize
+
+        Returns:
+            tuple: The canvas size (width, height)
+        """
+        return (self._cw, self._ch)
+
     def get_offset(self):
         """
         Retrieves the current offset
@@ -469,22 +811,54 @@ class ScrollableImage(tk.Frame):
 
     def alter_contr(self, contr):
         """
-        Alters the contrast of the displayed image
+        Alters the contrast of the displayed image;
+        only the visible portion is windowed again, the pyramid is kept
 
         Args:
-            contr (tuple): The new contrast range (lower, upper)
+            contr (tuple): The new contrast range (lower, upper);
+            (lower3, upper3, lower5, upper5) for combined images
         """
-        self.contr=contr
-        if self.pyramid[self.c_level][2]!=contr:
-            self.orig_windowed_im=MDNA.windowing(self.or_im, contr[0], contr[1])
-            res_im, w, h=self.resize_keeping_ratio(self.orig_windowed_im,
-                                                   self.pyramid[self.c_level][1][0],
-                                                   self.pyramid[self.c_level][1][1])
-            self.pyramid[self.c_level]=(res_im, (w, h), contr)
-
+        if contr!=self.contr:
+            self.contr=contr
+            self._rebuild_lut()
             self.move_to(self.offset_x, self.offset_y)
 
-    def resize_keeping_ratio(self, image, width=None, height=None, inter=INTERPOLATION):
+    def _rebuild_lut(self):
+        """
+        Updates the windowing lookup tables for the current contrast range;
+        windowed tiles of the previous range are dropped
+        """
+        if len(self.contr)==4: #combined image stores (Cy5, Cy3) channels
+            self._luts=[MDNA.build_window_lut(self.contr[2], self.contr[3]),
+                        MDNA.build_window_lut(self.contr[0], self.contr[1])]
+        else:
+            self._luts=[MDNA.build_window_lut(self.contr[0], self.contr[1])]
+        self._tiles.clear()
+
+    def _window(self, im):
+        """
+        Windows a part of a pyramid level; channels of combined images are windowed
+        with their own tables into the red and green planes of an RGB image,
+        single-plane green or red channel images into their own plane
+
+        Args:
+            im (numpy.ndarray): The 16-bit image
+
+        Returns:
+            numpy.ndarray: The windowed 8-bit image
+        """
+        if im.ndim==2 and self.channel is None:
+            return np.take(self._luts[0], im)
+        out=np.zeros(im.shape[:2]+(3,), dtype=np.uint8) #blue plane stays empty
+        if im.ndim==2: #channel 1 goes to the green plane, channel 2 to the red one
+            out[..., 2-self.channel]=np.take(self._luts[0], im)
+            return out
+        assert self.channel is None, "channel images are stored single-plane"
+        for c, lut in enumerate(self._luts):
+            out[..., c]=np.take(lut, im[..., c])
+        return out
+
+    def resize_keeping_ratio(self, image, width=None, height=None, inter=None):
         """
         Resizes an image while maintaining its aspect ratio
 
@@ -492,17 +866,18 @@ class ScrollableImage(tk.Frame):
             image (numpy.ndarray): The image to resize
             width (int, optional): Desired width of the resized image
             height (int, optional): Desired height of the resized image
-            inter (int): Interpolation method for resizing
+            inter (int, optional): Interpolation method for resizing; by default
+            DOWN_INTERPOLATION when shrinking and INTERPOLATION when enlarging
 
         Returns:
-            tuple: The resized image, its width, and its height
+            tuple: The resized C-contiguous image, its width, and its height
         """
         width=int(width) if width is not None else None
         height=int(height) if height is not None else None
 
         (h, w) = image.shape[:2]
         if width is None and height is None:
-            return (image, w, h)
+            return (np.ascontiguousarray(image), w, h)
         if width is None:
             r = height / float(h)
             dim = (int(w * r), height)
@@ -510,44 +885,79 @@ class ScrollableImage(tk.Frame):
             r = width / float(w)
             dim = (width, int(h * r))
 
-        resized = cv2.resize(image, dim, interpolation=inter)
+        resized = None
+        if (pyvips is not None and inter is None
+                and w*h >= self.VIPS_MIN_PIXELS and dim[0]*dim[1] < w*h):
+            resized = _pyvips_resize(image, dim)
+        if resized is None:
+            if inter is None:
+                inter = self.DOWN_INTERPOLATION if dim[0]*dim[1] < w*h else self.INTERPOLATION
+            resized = cv2.resize(image, dim, interpolation=inter)
 
         logger.info("image resized to %s", dim)
 
-        return (resized, dim[0], dim[1])
+        #pyramid levels must be C-contiguous so that crops never hide extra copies
+        return (np.ascontiguousarray(resized), dim[0], dim[1])
 
-    def get_pixel_coordinates(self, event):
-        offset_x = self.offset_x
-        offset_y = self.offset_y
-
-        resized_im = self.pyramid[self.c_level][0]
-        relative_x = offset_x + event.x
-        relative_y = offset_y + event.y
+    def _coords_transform(self):
+        """
+        Retrieves the mapping from coordinates in the current level to original
+        pixel coordinates; it is recomputed only when the level or canvas size changes
 
-        scale_x = self.or_im.shape[1] / resized_im.shape[1]
-        scale_y = self.or_im.shape[0] / resized_im.shape[0]
+        Returns:
+            tuple: Scales (x, y) and horizontal shift of the mapping
+        """
+        key=(self.c_level, self.pyramid[self.c_level][1])
+        if self._coords_map is None or self._coords_map[0]!=key:
+            dims=key[1]
+            scale_x = self.or_im.shape[1] / dims[0]
+            scale_y = self.or_im.shape[0] / dims[1]
+            shift_x = 0
+            if self.c_level == 'outscroll' or self.c_level < 0: #image is centered in the canvas
+                shift_x = int(self.or_im.shape[1] / 2) - int(self._cw / 2 * scale_x)
+            self._coords_map=(key, (scale_x, scale_y, shift_x))
+        return self._coords_map[1]
 
-        if(self.c_level == 'outscroll' or self.c_level < 0):
-            original_x = int(relative_x * scale_x)
-            original_x -= int(self.cnvs.winfo_width() / 2 * scale_x)
-            original_x += int(self.or_im.shape[1] / 2)
-            original_y = int(relative_y * scale_y)
-            original_x = max(0, min(self.or_im.shape[1] - 1, original_x))
-            original_y = max(0, min(self.or_im.shape[0] - 1, original_y))
+    def get_pixel_coordinates(self, event):
+        scale_x, scale_y, shift_x = self._coords_transform()
 
-            return original_x, original_y
-        else:
-            original_x = max(0, min(self.or_im.shape[1] - 1, int(relative_x * scale_x)))
-            original_y = max(0, min(self.or_im.shape[0] - 1, int(relative_y * scale_y)))
+        original_x = int((self.offset_x + event.x) * scale_x) + shift_x
+        original_y = int((self.offset_y + event.y) * scale_y)
+        original_x = max(0, min(self.or_im.shape[1] - 1, original_x))
+        original_y = max(0, min(self.or_im.shape[0] - 1, original_y))
 
-            return original_x, original_y
+        return original_x, original_y
 
     def show_pixel_coordinates(self, event):
-        original_x, original_y = self.get_pixel_coordinates(event)
+        """
+        Schedules an update of the coordinates label; motion events that
+        arrive before the next idle cycle share one update
+
+        Args:
+            event (tk.Event): The mouse motion event
+        """
+        self._motion_event = event
+        if not self._coords_pending:
+            self._coords_pending = True
+            self.after_idle(self._coords_tick)
+
+    def _coords_tick(self):
+        """
+        Shows original pixel coordinates of the latest cursor position;
+        the label is left untouched if the text would not change
+        """
+        self._coords_pending = False
         if self.channel == 1:
-            self.coords_label.config(text=f"Green image: x: {original_x}/{self.or_im.shape[1]-1}, y: {original_y}/{self.or_im.shape[0]-1}")
+            name = "Green"
         elif self.channel == 2:
-            self.coords_label.config(text=f"Red image: x: {original_x}/{self.or_im.shape[1]-1}, y: {original_y}/{self.or_im.shape[0]-1}")
+            name = "Red"
         elif self.gim is not None and self.rim is not None:
-            self.coords_label.config(text=f"Combined image: x: {original_x}/{self.or_im.shape[1]-1}, y: {original_y}/{self.or_im.shape[0]-1}")
+            name = "Combined"
+        else:
+            return
 
+        original_x, original_y = self.get_pixel_coordinates(self._motion_event)
+        text = f"{name} image: x: {original_x}/{self.or_im.shape[1]-1}, y: {original_y}/{self.or_im.shape[0]-1}"
+        if text != self._coords_text:
+            self._coords_text = text
+            self.coords_label.config(text=text)
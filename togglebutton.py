@@ -6,14 +6,27 @@ Classes:
     ContrButtons: A simple button to choose contrast target image in radio button style
 """
 import tkinter as tk
-from PIL import Image, ImageTk
+from iconcache import load_icon, IconRegistry
 from glogger import logger
 
 class ToggleButton:
     """
     A button with toggle functionality that switches between two states, 
     each represented by a different icon
+
+    Attributes:
+        HOVER_DELAY (int): Delay in ms after which hover changes are applied
+        BUTTON_DEFAULTS (dict): Default options of the Tk button
+        PACK_DEFAULTS (dict): Default pack options of the button
     """
+    __slots__=("frame", "ic_path", "ic_path_clicked", "h_size", "v_size", "clicked_state",
+               "icon_default", "icon_clicked", "button", "_photo", "_current", "_hover_after",
+               "_expose_id")
+    HOVER_DELAY=30
+    BUTTON_DEFAULTS={"compound": "center", "bg": "#222020", "border": 0, "command": None,
+                     "relief": "flat"}
+    PACK_DEFAULTS={"side": "left", "padx": 5, "pady": 5}
+
     def __init__(self, frame, ic_path, ic_path_clicked, **kw):
         """
         Initializes the ToggleButton with specified icons and configurations
@@ -23,38 +36,49 @@ class ToggleButton:
         self.ic_path_clicked=ic_path_clicked
         self.h_size=kw.pop("h_size", 40)
         self.v_size=kw.pop("v_size", 40)
-        self.compound=kw.pop("compound", "center")
-        self.bg=kw.pop("bg", "#222020")
-        self.border=kw.pop("border", 0)
-        self.command=kw.pop("command", None)
-        self.side=kw.pop("side", "left")
-        self.padx=kw.pop("padx", 5)
-        self.pady=kw.pop("pady", 5)
+        pack_opts={key: kw.pop(key, value) for key, value in self.PACK_DEFAULTS.items()}
+        button_opts={**self.BUTTON_DEFAULTS, **kw} #remaining kw are passed to tk.Button
+        button_opts.setdefault("activebackground", button_opts["bg"])
         self.clicked_state = False
 
+        #icons are referenced here, so that Tk images are not garbage collected
+        self.icon_default = None #loaded on first paint
+        self.icon_clicked = None #loaded on first hover or toggle
+        self._hover_after = None #pending hover update
+        self._current = None #icon shown by the button
+
         try:
-            self.icon_default=ImageTk.PhotoImage(Image.open(self.ic_path).resize((self.h_size,
-                                                                                  self.v_size)))
-            self.icon_clicked=ImageTk.PhotoImage(Image.open(self.ic_path_clicked).resize((self.h_size,
-                                                                                          self.v_size)))
-
-            self.button = tk.Button(self.frame,
-                                    image=self.icon_default,
-                                    compound=self.compound,
-                                    bg=self.bg,
-                                    activebackground=self.bg,
-                                    border=self.border,
-                                    command=self.command)
-            self.button.image = self.icon_default
-            self.button.pack(side=self.side, padx=self.padx, pady=self.pady)
-
-            self.button.bind("<Enter>", self.on_hover)
-            self.button.bind("<Leave>", self.on_leave)
+            #the button always shows its own image, icons are copied into it (see _show);
+            #it is blank until the icon is loaded, which keeps the layout
+            self._photo=tk.PhotoImage(width=self.h_size, height=self.v_size)
+
+            self.button = tk.Button(self.frame, image=self._photo, **button_opts)
+            self.button.pack(**pack_opts)
+
+            #hover handlers are closures over the bound method, no per-event method lookup
+            schedule = self._schedule_hover_state
+            self.button.bind("<Enter>", lambda _e: schedule(True))
+            self.button.bind("<Leave>", lambda _e: schedule(False))
+            self._expose_id=self.button.bind("<Expose>", self._on_first_expose, add="+")
 
         except Exception as e:
-            self.icon_default=None
-            self.icon_clicked = None
-            logger.error("Error loading image: %s", e)
+            logger.error("Error creating button: %s", e)
+
+    @classmethod
+    def from_registry(cls, frame, name, **kw):
+        """
+        Creates a ToggleButton with an icon pair registered in IconRegistry
+
+        Args:
+            frame (tk.Widget): The parent widget
+            name (str): The name of the registered icon pair
+            **kw: Additional button options
+
+        Returns:
+            ToggleButton: The new button
+        """
+        ic_path, ic_path_clicked, h_size, v_size = IconRegistry.get(name)
+        return cls(frame, ic_path, ic_path_clicked, h_size=h_size, v_size=v_size, **kw)
 
     def get_button(self):
         """
@@ -62,6 +86,58 @@ class ToggleButton:
         """
         return self.button
 
+    def _on_first_expose(self, event):
+        """
+        Shows the icon when the button is painted for the first time
+        """
+        self.button.unbind("<Expose>", self._expose_id)
+        if self._current is None: #nothing shown yet
+            self._show(self._get_clicked() if self.clicked_state else self._get_default())
+
+    def _show(self, icon):
+        """
+        Copies an icon into the image of the button unless it is already shown;
+        Tk redraws the button without reconfiguring it, and shared icons are never modified
+
+        Args:
+            icon (ImageTk.PhotoImage): The icon to show
+        """
+        if icon is self._current:
+            return
+        #'set' replaces pixels, the default 'overlay' would keep them under transparent ones
+        self._photo.tk.call(self._photo, "copy", icon, "-compositingrule", "set")
+        self._current = icon
+
+    def _get_default(self):
+        """
+        Retrieves the default state icon, loading it on first use
+
+        Returns:
+            ImageTk.PhotoImage: The default state icon
+        """
+        if self.icon_default is None:
+            try:
+                self.icon_default=load_icon(self.ic_path, self.h_size, self.v_size)
+            except Exception as e:
+                self.icon_default=tk.PhotoImage(width=self.h_size, height=self.v_size) #blank
+                logger.error("Error loading image: %s", e)
+        return self.icon_default
+
+    def _get_clicked(self):
+        """
+        Retrieves the clicked state icon, loading it on first use
+
+        Returns:
+            ImageTk.PhotoImage: The clicked state icon
+        """
+        if self.icon_clicked is None:
+            try:
+                self.icon_clicked=load_icon(self.ic_path_clicked, self.h_size, self.v_size)
+            except Exception as e:
+                self.icon_clicked=self._get_default()
+                logger.error("Error loading image: %s", e)
+        return self.icon_clicked
+
     def toggle_button_action(self):
         """
         Toggles the button state and updates its appearance accordingly
@@ -71,66 +147,69 @@ class ToggleButton:
         """
         self.clicked_state = not self.clicked_state
 
-        if self.clicked_state:
-            self.button.configure(image=self.icon_clicked, bg=self.bg, relief="flat")
-            self.button.image = self.icon_clicked
-        else:
-            self.button.configure(image=self.icon_default, bg=self.bg, relief="flat")
-            self.button.image = self.icon_default
+        self._show(self._get_clicked() if self.clicked_state else self._get_default())
         return self.clicked_state
 
-    def on_hover(self, event):
+    def _schedule_hover_state(self, entered):
         """
-        Updates the button appearance when the mouse hovers over it
+        Schedules the hover appearance when the mouse enters or leaves the button;
+        Enter/Leave events that arrive within HOVER_DELAY ms of each other
+        replace the pending update, so only the last one applies
+
+        Args:
+            entered (bool): Whether the mouse is over the button
         """
-        if not self.clicked_state:
-            self.button.configure(image=self.icon_clicked)
-            self.button.image = self.icon_clicked
+        if self._hover_after is not None:
+            self.button.after_cancel(self._hover_after)
+        self._hover_after = self.button.after(self.HOVER_DELAY, self._apply_hover_state, entered)
 
-    def on_leave(self, event):
+    def _apply_hover_state(self, entered):
         """
-        Updates the button appearance when the mouse leaves it
+        Shows the clicked state icon while the mouse is over the button or the
+        button is clicked, the default icon otherwise
+
+        Args:
+            entered (bool): Whether the mouse is over the button
         """
-        if not self.clicked_state:
-            self.button.configure(image=self.icon_default)
-            self.button.image = self.icon_default
-        else:
-            self.button.configure(image=self.icon_clicked)
-            self.button.image = self.icon_clicked
+        self._hover_after = None
+        self._show(self._get_clicked() if entered or self.clicked_state else self._get_default())
 
 class ContrButtons:
     """
     A simple button to choose contrast target image in radio button style
+
+    Colors come from named styles shared by all instances (plain tk.Button is kept
+    instead of ttk, since native ttk themes ignore button background colors)
+
+    Attributes:
+        BUTTON_DEFAULTS (dict): Default options of the Tk button
+        PACK_DEFAULTS (dict): Default pack options of the button
+        STYLES (dict): Named sets of color options
     """
+    __slots__=("frame", "button", "_style")
+    BUTTON_DEFAULTS={"text": "Button", "bg": "gray", "fg": "white", "font": ("Arial", 10),
+                     "border": 0, "command": None, "compound": "center", "relief": "flat",
+                     "highlightthickness": 0}
+    PACK_DEFAULTS={"side": "left", "padx": 5, "pady": 5}
+    STYLES={"inactive": {"bg": "#181818", "fg": "white"},
+            "green": {"bg": "lightgreen", "fg": "black"},
+            "red": {"bg": "lightcoral", "fg": "black"},
+            "both": {"bg": "gold", "fg": "black"}}
+
     def __init__(self, frame, **kw):
         """
-        Initializes a ContrButtons instance
+        Initializes a ContrButtons instance; the style kw names one of STYLES,
+        explicitly given options take precedence over it
         """
         self.frame=frame
-        self.text=kw.pop("text", "Button")
-        self.bg=kw.pop("bg", "gray")
-        self.fg=kw.pop("fg", "white")
-        self.font=kw.pop("font", ("Arial", 10))
-        self.border=kw.pop("border", 0)
-        self.command=kw.pop("command", None)
-        self.padx=kw.pop("padx", 5)
-        self.pady=kw.pop("pady", 5)
-        self.compound=kw.pop("compound", "center")
-        self.side=kw.pop("side", "left")
+        self._style=kw.pop("style", None)
+        pack_opts={key: kw.pop(key, value) for key, value in self.PACK_DEFAULTS.items()}
+        button_opts={**self.BUTTON_DEFAULTS, **self.STYLES.get(self._style, {}), **kw}
+        button_opts.setdefault("activebackground", button_opts["bg"])
 
         try:
-            self.button=tk.Button(self.frame,
-                                  text=self.text,
-                                  compound=self.compound,
-                                  bg=self.bg,
-                                  activebackground=self.bg,
-                                  border=self.border,
-                                  command=self.command,
-                                  fg=self.fg,
-                                  font=self.font,
-                                  relief="flat",
-                                  highlightthickness=0)
-            self.button.pack(side=self.side, padx=self.padx, pady=self.pady)
+            self.button=tk.Button(self.frame, **button_opts)
+            self.button.pack(**pack_opts)
 
         except Exception as e:
             logger.error("Error creating button: %s", e)
@@ -140,3 +219,15 @@ class ContrButtons:
         Retrieves the underlying Tkinter Button widget
         """
         return self.button
+
+    def set_style(self, style):
+        """
+        Applies one of STYLES to the button; the button is not reconfigured
+        if the style is already applied
+
+        Args:
+            style (str): The name of the style
+        """
+        if style != self._style:
+            self.button.configure(**self.STYLES[style])
+            self._style=style
@@ -0,0 +1,56 @@
+"""
+This script writes toolbar icons at their display size next to the source icons
+
+The source icons are large (up to ~2000px) and are otherwise downscaled on every
+start; iconcache.load_icon picks up '<name>@<width>x<height>.png' files when they exist.
+Run it from the repository root after changing an icon or its size in the GUI:
+
+    python tools/prebuild_icons.py
+"""
+import os
+from PIL import Image
+
+#(path, width, height) of icons used by ToggleButton in gui.py
+ICONS = (
+    ("icons/upload_min.png", 38, 38),
+    ("icons/upload_min_toggle_white.png", 38, 38),
+    ("icons/comp_min.png", 43, 43),
+    ("icons/comp_min_toggle_white.png", 43, 43),
+    ("icons/contr_min.png", 40, 40),
+    ("icons/contr_min_toggle_white.png", 40, 40),
+    ("icons/com_zoom_min.png", 50, 25),
+    ("icons/com_zoom_min_toggle_white.png", 50, 25),
+)
+
+def prebuilt_path(path, width, height):
+    """
+    Builds the path of the prebuilt version of an icon
+
+    Args:
+        path (str): The path to the source icon
+        width (int): The width of the icon
+        height (int): The height of the icon
+
+    Returns:
+        str: The path of the prebuilt icon
+    """
+    return f"{os.path.splitext(path)[0]}@{width}x{height}.png"
+
+def prebuild(icons=ICONS):
+    """
+    Resizes icons with Lanczos filter and saves them as png
+
+    Args:
+        icons (iterable): (path, width, height) of icons to prebuild
+    """
+    for path, width, height in icons:
+        out = prebuilt_path(path, width, height)
+        with Image.open(path) as im:
+            im = im.resize((width, height), Image.LANCZOS)
+        if im.mode == "RGBA" and im.getchannel("A").getextrema() == (255, 255):
+            im = im.convert("RGB") #fully opaque, alpha channel is not needed
+        im.save(out, optimize=True)
+        print(f"{path} -> {out}")
+
+if __name__ == "__main__":
+    prebuild()
@@ -0,0 +1,38 @@
+"""
+This module provides a compiled windowing kernel for images that cannot be
+windowed with a lookup table (see MDNA.windowing), e.g. float images
+
+The kernel subtracts, scales, clips and casts in one pass over the image,
+without float intermediates, and is parallelized over rows
+
+Optional dependencies:
+- numba; if it is not installed window_to_u8 is None and callers fall back to NumPy
+"""
+import numpy as np
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def window_to_u8(src, lower, scale, out):
+        """
+        Windows a 2D image into a preallocated 8-bit image
+
+        Args:
+            src (numpy.ndarray): The 2D input image; channels may be flattened into rows
+            lower (float): The lower intensity threshold
+            scale (float): Output levels per input level, 255/(upper-lower)
+            out (numpy.ndarray): The uint8 output of the same shape as src
+        """
+        for i in prange(src.shape[0]):
+            for j in range(src.shape[1]):
+                v = (src[i, j] - lower) * scale
+                if v < 0:
+                    v = 0
+                elif v > 255:
+                    v = 255
+                out[i, j] = np.uint8(v)
+else:
+    window_to_u8 = None